@@ -0,0 +1,170 @@
+# Compressed doc-id bitmaps for query-time filters
+"""
+Roaring-style layout:
+
+* Doc ids are split into a high key (id >> 16) and a low 16-bit value
+* Each high key owns one container holding its low values
+* Sparse containers (<= 4096 values) are sorted array('H'), 2 bytes per value
+* Dense containers are a fixed 8 KiB bitset
+* Intersections walk the smaller side and probe the other, so cost tracks the smaller set
+"""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+
+ARRAY_CONTAINER_MAX = 4096
+CHUNK_BITS = 16
+CHUNK_SIZE = 1 << CHUNK_BITS
+LOW_MASK = CHUNK_SIZE - 1
+BITSET_BYTES = CHUNK_SIZE // 8
+
+Container = array | bytearray
+
+
+def _container_from_lows(lows: list[int]) -> Container:
+    # lows must be sorted and unique
+    if len(lows) <= ARRAY_CONTAINER_MAX:
+        return array("H", lows)
+    bits = bytearray(BITSET_BYTES)
+    for low in lows:
+        bits[low >> 3] |= 1 << (low & 7)
+    return bits
+
+
+def _container_from_int(bits: int) -> Container | None:
+    if not bits:
+        return None
+    if bits.bit_count() <= ARRAY_CONTAINER_MAX:
+        return array("H", _int_lows(bits))
+    return bytearray(bits.to_bytes(BITSET_BYTES, "little"))
+
+
+def _int_lows(bits: int) -> Iterator[int]:
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+def _container_as_int(container: Container) -> int:
+    if isinstance(container, bytearray):
+        return int.from_bytes(container, "little")
+    bits = bytearray(BITSET_BYTES)
+    for low in container:
+        bits[low >> 3] |= 1 << (low & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _container_len(container: Container) -> int:
+    if isinstance(container, array):
+        return len(container)
+    return int.from_bytes(container, "little").bit_count()
+
+
+def _container_contains(container: Container, low: int) -> bool:
+    if isinstance(container, array):
+        pos = bisect_left(container, low)
+        return pos < len(container) and container[pos] == low
+    return bool(container[low >> 3] >> (low & 7) & 1)
+
+
+def _container_lows(container: Container) -> Iterator[int]:
+    if isinstance(container, array):
+        yield from container
+        return
+    for byte_idx, byte in enumerate(container):
+        while byte:
+            lowest = byte & -byte
+            yield byte_idx * 8 + lowest.bit_length() - 1
+            byte ^= lowest
+
+
+def _container_and(left: Container, right: Container) -> Container | None:
+    if isinstance(left, bytearray) and isinstance(right, bytearray):
+        return _container_from_int(_container_as_int(left) & _container_as_int(right))
+    # at least one side is a small array: probe the other with its values
+    small, other = (left, right) if _container_len(left) <= _container_len(right) else (right, left)
+    lows = [low for low in _container_lows(small) if _container_contains(other, low)]
+    return array("H", lows) if lows else None
+
+
+def _container_or(left: Container, right: Container) -> Container:
+    if isinstance(left, array) and isinstance(right, array) and len(left) + len(right) <= ARRAY_CONTAINER_MAX:
+        return array("H", sorted(set(left) | set(right)))
+    return _container_from_int(_container_as_int(left) | _container_as_int(right))
+
+
+class Bitmap:
+    """
+    Immutable compressed set of non-negative integers (doc ids), built once at index time.
+    """
+
+    def __init__(self, containers: dict[int, Container] | None = None):
+        self._containers: dict[int, Container] = containers or {}
+        self._len = sum(_container_len(c) for c in self._containers.values())
+
+    @classmethod
+    def from_values(cls, values: Iterable[int]) -> "Bitmap":
+        chunks: dict[int, list[int]] = {}
+        for value in sorted(set(values)):
+            if value < 0:
+                raise ValueError(f"Bitmap values must be non-negative, got {value}")
+            chunks.setdefault(value >> CHUNK_BITS, []).append(value & LOW_MASK)
+        return cls({high: _container_from_lows(lows) for high, lows in chunks.items()})
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, int) or value < 0:
+            return False
+        container = self._containers.get(value >> CHUNK_BITS)
+        return container is not None and _container_contains(container, value & LOW_MASK)
+
+    def __iter__(self) -> Iterator[int]:
+        # ascending order
+        for high in sorted(self._containers):
+            base = high << CHUNK_BITS
+            for low in _container_lows(self._containers[high]):
+                yield base | low
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        containers = {}
+        for high in self._containers.keys() & other._containers.keys():
+            container = _container_and(self._containers[high], other._containers[high])
+            if container is not None:
+                containers[high] = container
+        return Bitmap(containers)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        containers = dict(self._containers)
+        for high, container in other._containers.items():
+            containers[high] = _container_or(containers[high], container) if high in containers else container
+        return Bitmap(containers)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Bitmap):
+            return NotImplemented
+        return len(self) == len(other) and list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"Bitmap(len={len(self)}, containers={len(self._containers)})"
+
+    def select_range(self, lo: int | None = None, hi: int | None = None) -> "Bitmap":
+        # members within [lo, hi] (inclusive, either side open); untouched containers are shared
+        lo = 0 if lo is None else max(lo, 0)
+        containers = {}
+        for high, container in self._containers.items():
+            base = high << CHUNK_BITS
+            if base + LOW_MASK < lo or (hi is not None and base > hi):
+                continue
+            if base >= lo and (hi is None or base + LOW_MASK <= hi):
+                containers[high] = container
+                continue
+            low_lo = max(lo - base, 0)
+            low_hi = LOW_MASK if hi is None else min(hi - base, LOW_MASK)
+            lows = [low for low in _container_lows(container) if low_lo <= low <= low_hi]
+            if lows:
+                containers[high] = _container_from_lows(lows)
+        return Bitmap(containers)
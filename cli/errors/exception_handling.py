@@ -20,3 +20,19 @@ class CacheIOError(SearchEngineError):
 
 class InvalidTerm(SearchEngineError):
     pass
+
+
+class InvalidCursor(SearchEngineError):
+    pass
+
+
+class InvalidPage(SearchEngineError):
+    pass
+
+
+class InvalidFilter(SearchEngineError):
+    pass
+
+
+class SnapshotIntegrityError(DataLoadError):
+    pass
@@ -1,15 +1,39 @@
+import base64
+import binascii
 import json
+import math
 import string
 from typing import Any
 
+from errors.exception_handling import InvalidCursor
 from nltk.stem import PorterStemmer
 
 DEFAULT_MAX_TITLES = 5
+DEFAULT_STATS_TOP_N = 10
 
-INDEX_PATH = "./cache/index.pkl"
-DOCMAP_PATH = "./cache/docmap.pkl"
-TF_PATH = "./cache/term_frequencies.pkl"
-DOC_LENGTHS_PATH = "./cache/doc_lengths.pkl"
+CACHE_DIR = "./cache"
+SNAPSHOTS_DIRNAME = "snapshots"
+CURRENT_FILENAME = "CURRENT"
+MANIFEST_FILENAME = "manifest.json"
+
+# artifact name -> file name inside a snapshot directory
+INDEX_FILENAME = "index.pkl"
+DOCMAP_FILENAME = "docmap.pkl"
+TF_FILENAME = "term_frequencies.pkl"
+DOC_LENGTHS_FILENAME = "doc_lengths.pkl"
+FILTERS_FILENAME = "filters.pkl"
+
+# movie fields indexed into bitmaps at build time for `--filter field=value`
+# the doc id field is always filterable (equality or `lo..hi` ranges)
+DOC_ID_FIELD = "id"
+DEFAULT_FILTER_FIELDS: tuple[str, ...] = ()
+
+# how many published snapshots to keep on disk (the current one is always kept)
+SNAPSHOT_RETENTION = 3
+# temp files left by a crashed build/publish are removed once their pid is gone or they are this old
+SNAPSHOT_TEMP_MAX_AGE_SECONDS = 6 * 60 * 60
+# how often a LiveIndex checks CURRENT for a newly published snapshot
+SNAPSHOT_POLL_SECONDS = 5.0
 
 MOVIES_PATH: str = "data/movies.json"
 STOP_PATH: str = "data/stopwords.txt"
@@ -18,6 +42,50 @@ BM25_K1 = 1.5
 BM25_B = 0.75
 
 
+# pagination cursor kinds -> element types of their rank key
+BM25_CURSOR = "bm25"  # (-score, doc_id)
+KEYWORD_CURSOR = "keyword"  # (doc_id,)
+CURSOR_KEY_TYPES: dict[str, tuple[type, ...]] = {
+    BM25_CURSOR: (float, int),
+    KEYWORD_CURSOR: (int,),
+}
+
+
+# opaque pagination cursor: the kind of search plus the rank key of the last result on a page
+def encode_cursor(kind: str, key: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"kind": kind, "key": list(key)}).encode()).decode()
+
+
+def decode_cursor(cursor: str, kind: str) -> tuple:
+    # raise InvalidCursor unless the cursor came from a `kind` search and its key has the right types
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor(f"Malformed cursor: {cursor}") from e
+    if not isinstance(payload, dict) or not isinstance(payload.get("key"), list):
+        raise InvalidCursor(f"Malformed cursor: {cursor}")
+    if payload.get("kind") != kind:
+        raise InvalidCursor(f"Cursor is from a {payload.get('kind')!r} search, not {kind!r}")
+    key = payload["key"]
+    types = CURSOR_KEY_TYPES[kind]
+    if len(key) != len(types):
+        raise InvalidCursor(f"Malformed cursor: {cursor}")
+    decoded = []
+    for value, expected in zip(key, types, strict=True):
+        # bool is an int subclass; json floats like 2.0 stay floats, but accept ints for float slots
+        if isinstance(value, bool) or not isinstance(value, int | float if expected is float else expected):
+            raise InvalidCursor(f"Malformed cursor: {cursor}")
+        try:
+            converted = expected(value)
+        except OverflowError as e:
+            raise InvalidCursor(f"Malformed cursor: {cursor}") from e
+        # json.loads accepts NaN/Infinity, which never compare usefully against real scores
+        if isinstance(converted, float) and not math.isfinite(converted):
+            raise InvalidCursor(f"Malformed cursor: {cursor}")
+        decoded.append(converted)
+    return tuple(decoded)
+
+
 # load stop words from file
 def load_stopwords() -> set[str]:
     with open(STOP_PATH) as stopFile:
@@ -3,18 +3,98 @@
 import argparse
 
 from errors.exception_handling import SearchEngineError
-from helpers import BM25_B, BM25_K1
+from helpers import BM25_B, BM25_K1, DEFAULT_FILTER_FIELDS, DEFAULT_MAX_TITLES, DEFAULT_STATS_TOP_N
 from search_cls import InvertedIndex, MovieSearch
 
 
+def positive_int(value: str) -> int:
+    num = int(value)
+    if num < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return num
+
+
+def add_paging_arguments(subparser: argparse.ArgumentParser) -> None:
+    subparser.add_argument(
+        "--page-size", type=positive_int, default=DEFAULT_MAX_TITLES, help="Number of results per page"
+    )
+    # a cursor already marks where the next page starts, so it cannot be combined with --page
+    position = subparser.add_mutually_exclusive_group()
+    position.add_argument("--page", type=positive_int, default=1, help="Page number to show (1-based)")
+    position.add_argument("--cursor", type=str, default=None, help="Continue after the page that returned this cursor")
+
+
+def add_filter_argument(subparser: argparse.ArgumentParser) -> None:
+    subparser.add_argument(
+        "--filter",
+        action="append",
+        metavar="FIELD=VALUE",
+        help="Only match docs where FIELD equals VALUE (or lies in lo..hi); repeat to AND filters",
+    )
+
+
+def page_offset(args: argparse.Namespace) -> int:
+    # offset relative to the cursor when one is given, otherwise from the first result
+    return 0 if args.cursor else (args.page - 1) * args.page_size
+
+
+def print_explain(explain: dict) -> None:
+    print("\nExplain:")
+    print(f"  tokens: {explain['tokens']}")
+    for term in explain["terms"]:
+        print(f"  term '{term['term']}': df={term['df']} idf={term['idf']:.4f}")
+    print(f"  postings scanned: {explain['postings_scanned']}")
+    print(f"  docs scored: {explain['docs_scored']} of {explain['num_docs']}")
+    if explain["filter_docs"] is not None:
+        print(f"  docs passing filters: {explain['filter_docs']}")
+    for stage, seconds in explain["timings"].items():
+        print(f"  {stage}: {seconds * 1000:.3f} ms")
+
+
+def print_stats(stats: dict) -> None:
+    print(f"Snapshot: {stats['version']}")
+    print(f"Documents: {stats['num_docs']}")
+    print(f"Vocabulary size: {stats['vocabulary_size']}")
+    print(f"Total postings: {stats['total_postings']}")
+    print(f"Average doc length: {stats['avg_doc_length']:.2f}")
+    dist = stats["postings_length"]
+    print(
+        f"Postings length: min={dist['min']} mean={dist['mean']:.2f} p50={dist['p50']} "
+        f"p90={dist['p90']} p99={dist['p99']} max={dist['max']}"
+    )
+    print("Longest postings:")
+    for entry in stats["longest_postings"]:
+        print(f"  {entry['term']}\t{entry['df']}\t({entry['doc_fraction']:.1%} of docs)")
+    if stats["filter_fields"]:
+        print("Filter fields (distinct values):")
+        for field, count in stats["filter_fields"].items():
+            print(f"  {field}: {count}")
+    print("Memory (bytes, approx):")
+    for name, size in stats["memory_bytes"].items():
+        print(f"  {name}: {size}")
+    print("On-disk artifacts (bytes):")
+    for name, size in stats["artifact_bytes"].items():
+        print(f"  {name}: {size}")
+    if stats["load_seconds"] is not None:
+        print(f"Load time: {stats['load_seconds'] * 1000:.1f} ms")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Keyword Search CLI")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
     search_parser = subparsers.add_parser("search", help="Search movies using BM25")
     search_parser.add_argument("query", type=str, help="Search Query")
-
-    subparsers.add_parser("build", help="Build Inverse index artifacts")
+    add_paging_arguments(search_parser)
+    add_filter_argument(search_parser)
+
+    build_parser = subparsers.add_parser("build", help="Build Inverse index artifacts")
+    build_parser.add_argument(
+        "--filter-field",
+        action="append",
+        metavar="FIELD",
+        help="Movie field to index for --filter queries (repeatable; the id field is always filterable)",
+    )
     subparsers.add_parser("load", help="Load pickle cache files for processed data")
 
     term_frequency_parser = subparsers.add_parser("tf", help="Fetch term frequency in the related doc")
@@ -41,6 +121,16 @@ def main() -> None:
 
     bm25search_parser = subparsers.add_parser("bm25search", help="Search movies using full BM25 scoring")
     bm25search_parser.add_argument("query", type=str, help="Search query")
+    add_paging_arguments(bm25search_parser)
+    add_filter_argument(bm25search_parser)
+    bm25search_parser.add_argument(
+        "--explain", action="store_true", help="Show per-term df/idf, postings scanned and time per stage"
+    )
+
+    stats_parser = subparsers.add_parser("stats", help="Report index size and shape for capacity planning")
+    stats_parser.add_argument(
+        "--top", type=positive_int, default=DEFAULT_STATS_TOP_N, help="Number of longest postings lists to show"
+    )
 
     args = parser.parse_args()
     inv = InvertedIndex()
@@ -50,7 +140,7 @@ def main() -> None:
         print(f"Unable to load data file...check your movies.json file: {e}")
         return 2
 
-    cache_commands = {"search", "load", "tf", "idf", "tfidf", "bm25idf", "bm25tf", "bm25search"}
+    cache_commands = {"search", "load", "tf", "idf", "tfidf", "bm25idf", "bm25tf", "bm25search", "stats"}
     if args.command in cache_commands:
         print("Loading cache files...")
         try:
@@ -62,18 +152,38 @@ def main() -> None:
     match args.command:
         case "search":
             print(f"Searching for: {args.query}")
-            titles = ms.find_titles(args.query, idx_cache=inv.index, docmap_cache=inv.docmap)
-            ms.print_results(titles)
+            offset = page_offset(args)
+            try:
+                page = ms.find_page(
+                    args.query,
+                    idx_cache=inv.index,
+                    docmap_cache=inv.docmap,
+                    offset=offset,
+                    limit=args.page_size,
+                    cursor=args.cursor,
+                    allowed=inv.filter_docs(args.filter),
+                )
+            except SearchEngineError as e:
+                print(f"Error: {e}")
+                return 2
+            # the global rank of a cursor page is unknown, so its results are not numbered
+            ms.print_results(
+                [title for _doc_id, title in page["results"]],
+                n=args.page_size,
+                start=None if args.cursor else offset,
+            )
+            if page["next_cursor"]:
+                print(f"Next cursor: {page['next_cursor']}")
         case "build":
             try:
-                inv.build(ms._movies)
+                inv.build(ms._movies, filter_fields=args.filter_field or DEFAULT_FILTER_FIELDS)
                 # Debug statement
                 # merida_list = inv.get_documents("merida")
                 # print(f"First document for token 'merida' = {merida_list[0]}")
             except Exception as e:
                 print(f"Unable to build index and/or docmap: {e}")
         case "load":
-            print("Cache loaded successfully.")
+            print(f"Cache loaded successfully (snapshot {inv.version}).")
         case "tf":
             print(f"Fetching term frequency with params {args.id} -- {args.term} ")
             num = inv.get_tf(args.id, args.term)
@@ -93,9 +203,27 @@ def main() -> None:
             bm25tf = inv.get_bm25_tf(args.doc_id, args.term, args.k1, args.b)
             print(f"BM25 TF score of '{args.term}' in document '{args.doc_id}': {bm25tf:.2f}")
         case "bm25search":
-            bm_list = inv.bm25_search(args.query)
-            for bm_item in bm_list:
+            explain = {} if args.explain else None
+            try:
+                page = inv.bm25_search_page(
+                    args.query,
+                    offset=page_offset(args),
+                    limit=args.page_size,
+                    cursor=args.cursor,
+                    explain=explain,
+                    allowed=inv.filter_docs(args.filter),
+                )
+            except SearchEngineError as e:
+                print(f"Error: {e}")
+                return 2
+            for bm_item in page["results"]:
                 print(f"({bm_item[0]}) {bm_item[1]} - Score: {bm_item[2]:.2f}")
+            if page["next_cursor"]:
+                print(f"Next cursor: {page['next_cursor']}")
+            if explain is not None:
+                print_explain(explain)
+        case "stats":
+            print_stats(inv.stats(top_n=args.top))
         case _:
             parser.print_help()
 
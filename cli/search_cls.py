@@ -5,30 +5,121 @@
 * Order return by IDs ascending
 """
 
+import heapq
 import json
 import math
-import os
-import pickle
+import sys
+import threading
+import time
 from collections import Counter
+from collections.abc import Iterable
 from typing import Any
 
+from bitmaps import Bitmap
 from errors.exception_handling import (
     CacheIOError,
-    DataLoadError,
     IndexBuildError,
+    InvalidFilter,
+    InvalidPage,
     InvalidTerm,
+    SearchEngineError,
 )
 from helpers import (
     BM25_B,
+    BM25_CURSOR,
     BM25_K1,
+    CACHE_DIR,
+    DEFAULT_FILTER_FIELDS,
     DEFAULT_MAX_TITLES,
-    DOC_LENGTHS_PATH,
-    DOCMAP_PATH,
-    INDEX_PATH,
-    TF_PATH,
+    DEFAULT_STATS_TOP_N,
+    DOC_ID_FIELD,
+    KEYWORD_CURSOR,
+    SNAPSHOT_POLL_SECONDS,
+    decode_cursor,
+    encode_cursor,
     load_movies,
     normalize,
 )
+from snapshots import current_version, prune_snapshots, publish, read_snapshot, write_snapshot
+
+
+def _deep_sizeof(obj: Any) -> int:
+    # approximate in-memory footprint of nested dict/list/set structures (shared objects counted once)
+    seen: set[int] = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, list | tuple | set | frozenset):
+            stack.extend(item)
+        elif hasattr(item, "__dict__"):
+            stack.append(vars(item))
+    return total
+
+
+def _filtered_postings(postings: Iterable[int], allowed: Bitmap | None) -> Iterable[int]:
+    # intersect a postings list with a filter bitmap, walking whichever side is smaller
+    # so excluded docs are never scored and selective filters scan fewer postings
+    if allowed is None:
+        return postings
+    if isinstance(postings, set | frozenset) and len(allowed) < len(postings):
+        return [doc_id for doc_id in allowed if doc_id in postings]
+    return [doc_id for doc_id in postings if doc_id in allowed]
+
+
+def _parse_range(value: str) -> tuple[float | None, float | None] | None:
+    # `lo..hi` with numeric bounds (either side may be empty) -> (lo, hi)
+    # anything else, e.g. a title like "Kaakha..Kaakha", is not a range and returns None
+    # inf/nan bounds parse as floats but cannot bound a range, so they raise InvalidFilter
+    lo_text, sep, hi_text = value.partition("..")
+    if not sep or not (lo_text or hi_text):
+        return None
+    try:
+        bounds = (float(lo_text) if lo_text else None, float(hi_text) if hi_text else None)
+    except ValueError:
+        return None
+    if any(bound is not None and not math.isfinite(bound) for bound in bounds):
+        raise InvalidFilter(f"Range bounds must be finite numbers, got '{value}'")
+    return bounds
+
+
+def _percentile(sorted_values: list[int], pct: float) -> int:
+    # nearest-rank percentile over an ascending list
+    if not sorted_values:
+        return 0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def _select_page(
+    keys: Iterable[tuple],
+    kind: str,
+    offset: int = 0,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> tuple[list[tuple], str | None]:
+    # pick one page of rank keys (ascending) with a bounded heap instead of sorting every candidate
+    # returns the page plus a `kind` cursor for the next page (None when this is the last page)
+    if offset < 0 or (limit is not None and limit < 0):
+        raise InvalidPage(f"offset and limit must be >= 0, got offset={offset} limit={limit}")
+    if cursor is not None:
+        after = decode_cursor(cursor, kind)
+        keys = (key for key in keys if key > after)
+    if limit is None:
+        return sorted(keys)[offset:], None
+    if limit == 0:
+        return [], None
+    window = heapq.nsmallest(offset + limit + 1, keys)
+    page = window[offset : offset + limit]
+    next_cursor = encode_cursor(kind, page[-1]) if len(window) > offset + limit else None
+    return page, next_cursor
 
 
 class MovieSearch:
@@ -52,17 +143,33 @@ class MovieSearch:
         query: str,
         idx_cache: dict[str, list[int] | set[int]],
         docmap_cache: dict[int | str, dict[str, Any]],
+        offset: int = 0,
+        limit: int | None = None,
     ) -> list[str]:
+        # matching titles ordered by doc id; only the requested page is materialized
+        page = self.find_page(query, idx_cache, docmap_cache, offset=offset, limit=limit)
+        return [title for _doc_id, title in page["results"]]
+
+    def find_page(
+        self,
+        query: str,
+        idx_cache: dict[str, list[int] | set[int]],
+        docmap_cache: dict[int | str, dict[str, Any]],
+        offset: int = 0,
+        limit: int | None = DEFAULT_MAX_TITLES,
+        cursor: str | None = None,
+        allowed: Bitmap | None = None,
+    ) -> dict[str, Any]:
+        # one page of (doc_id, title) matches plus an opaque cursor for the next page
+        # `allowed` (see InvertedIndex.filter_docs) restricts matches while walking the postings
         q_tokens = normalize(query)
 
-        found_titles: list[str] = []
-        inverse_idx_matches: list[int] = []
+        unique_ids: set[int] = set()
         for token in q_tokens:
-            inverse_idx_matches.extend(idx_cache.get(token, ""))
-        unique_ids = sorted(set(inverse_idx_matches))
-        for doc_id in unique_ids:
-            found_titles.append(docmap_cache[doc_id]["title"])
-        return found_titles
+            unique_ids.update(_filtered_postings(idx_cache.get(token, ()), allowed))
+        page, next_cursor = _select_page(((doc_id,) for doc_id in unique_ids), KEYWORD_CURSOR, offset, limit, cursor)
+        results = [(doc_id, docmap_cache[doc_id]["title"]) for (doc_id,) in page]
+        return {"results": results, "next_cursor": next_cursor}
         """
         matched_titles: list[tuple[str, int]] = []
         for movie in self._movies:
@@ -75,9 +182,11 @@ class MovieSearch:
         return [x[0] for x in matched_titles]
         """
 
-    def print_results(self, titles: list, n: int = DEFAULT_MAX_TITLES) -> None:
-        for num, title in enumerate(titles[:n]):
-            print(f"{num + 1}. {title}")
+    def print_results(self, titles: list, n: int = DEFAULT_MAX_TITLES, start: int | None = 0) -> None:
+        # `start` is the offset of the page, so numbering continues across pages
+        # start=None prints an unnumbered list (e.g. a page reached by cursor, whose rank is unknown)
+        for num, title in enumerate(titles[:n], start=start or 0):
+            print(f"{num + 1}. {title}" if start is not None else f"- {title}")
 
 
 class InvertedIndex:
@@ -92,32 +201,45 @@ class InvertedIndex:
         self.docmap: dict[int, dict[str, Any]] = {}
         self.term_frequencies: dict[int, Counter] = {}
         self.doc_lengths: dict[int, int] = {}
+        # snapshot version this index was loaded from / published as (None until then)
+        self.version: str | None = None
+        # filled in by from_cache: seconds spent loading and on-disk bytes per artifact
+        self.load_seconds: float | None = None
+        self.artifact_bytes: dict[str, int] = {}
+        # filter bitmaps: every doc id, plus field -> str(value) -> doc ids for declared fields
+        self.doc_ids: Bitmap = Bitmap()
+        self.filters: dict[str, dict[str, Bitmap]] = {}
 
     @classmethod
-    def from_cache(cls) -> "InvertedIndex":
-        idx_cache, docmap_cache, tf_cache, doclength_cache = cls.load()
+    def from_cache(cls, cache_dir: str = CACHE_DIR, version: str | None = None) -> "InvertedIndex":
+        start = time.perf_counter()
+        idx_cache, docmap_cache, tf_cache, doclength_cache, filters_cache, manifest = cls.load(cache_dir, version)
+        load_seconds = time.perf_counter() - start
         inv = cls()
+        inv.load_seconds = load_seconds
+        inv.artifact_bytes = {name: entry["bytes"] for name, entry in manifest["artifacts"].items()}
         inv.index = idx_cache
         inv.docmap = docmap_cache
         inv.term_frequencies = tf_cache
         inv.doc_lengths = doclength_cache
+        inv.doc_ids = filters_cache["doc_ids"]
+        inv.filters = filters_cache["fields"]
+        inv.version = manifest["version"]
         return inv
 
     @staticmethod
-    def load():
-        # Load pickle cache files from disk
-        try:
-            with open(INDEX_PATH, "rb") as ifp:
-                index_cache = pickle.load(ifp)
-            with open(DOCMAP_PATH, "rb") as rfp:
-                docmap_cache = pickle.load(rfp)
-            with open(TF_PATH, "rb") as tfp:
-                tf_cache = pickle.load(tfp)
-            with open(DOC_LENGTHS_PATH, "rb") as dfp:
-                doclength_cache = pickle.load(dfp)
-        except FileNotFoundError as e:
-            raise DataLoadError(f"Unable to load cache files: {e}") from e
-        return index_cache, docmap_cache, tf_cache, doclength_cache
+    def load(cache_dir: str = CACHE_DIR, version: str | None = None):
+        # Load one pinned snapshot from disk (the published one unless a version is given)
+        # every artifact comes from the same snapshot directory and is checksum-verified
+        _loaded_version, artifacts, manifest = read_snapshot(cache_dir, version)
+        return (
+            artifacts["index"],
+            artifacts["docmap"],
+            artifacts["term_frequencies"],
+            artifacts["doc_lengths"],
+            artifacts["filters"],
+            manifest,
+        )
 
     def get_documents(self, term: str) -> list[int]:
         # Get set of doc_ids for given token
@@ -125,8 +247,9 @@ class InvertedIndex:
         normalized_term = term.lower()
         return sorted(self.index.get(normalized_term, set()))
 
-    def build(self, movies: list[dict]) -> None:
+    def build(self, movies: list[dict], filter_fields: Iterable[str] = DEFAULT_FILTER_FIELDS) -> None:
         #  iterate over all the movies and add them to both the index and the docmap.
+        #  `filter_fields` are the docmap fields indexed into bitmaps for query-time filters
         print("Building inverse index...")
         try:
             for movie in movies:
@@ -137,26 +260,33 @@ class InvertedIndex:
                 self.docmap[doc_id] = movie
                 # build inverse index
                 self._add_document(doc_id=doc_id, text=text)
+            self._build_filters(filter_fields)
             print("Done!")
-            print("Saving index and docmap to pickle files")
-            self.save()
+            print("Saving index snapshot...")
+            version = self.save()
+            print(f"Published snapshot {version}")
         except KeyError as e:
             raise IndexBuildError(f"Missing required movie field: {e}") from e
         except OSError as e:
             raise CacheIOError(f"Failed writing cache files: {e}") from e
 
-    def save(self) -> None:
-        # use pickle.dump method to save index and docmap to files
-        if not os.path.isdir("./cache"):
-            os.mkdir("./cache")
-        with open(INDEX_PATH, "wb") as index_fp:
-            pickle.dump(self.index, index_fp)
-        with open(DOCMAP_PATH, "wb") as docmap_fp:
-            pickle.dump(self.docmap, docmap_fp)
-        with open(TF_PATH, "wb") as tf_fp:
-            pickle.dump(self.term_frequencies, tf_fp)
-        with open(DOC_LENGTHS_PATH, "wb") as doclength_fp:
-            pickle.dump(self.doc_lengths, doclength_fp)
+    def save(self, cache_dir: str = CACHE_DIR) -> str:
+        # write all artifacts into a new snapshot, then atomically publish it
+        # readers never see a mix of old and new files, and a crash mid-write leaves CURRENT untouched
+        version = write_snapshot(
+            {
+                "index": self.index,
+                "docmap": self.docmap,
+                "term_frequencies": self.term_frequencies,
+                "doc_lengths": self.doc_lengths,
+                "filters": {"doc_ids": self.doc_ids, "fields": self.filters},
+            },
+            cache_dir,
+        )
+        publish(version, cache_dir)
+        prune_snapshots(cache_dir)
+        self.version = version
+        return version
 
     def _add_document(self, doc_id: int, text: str) -> None:
         cnt = Counter()
@@ -169,6 +299,66 @@ class InvertedIndex:
         # add to counter dictionary
         self.term_frequencies[doc_id] = cnt
 
+    def _build_filters(self, filter_fields: Iterable[str]) -> None:
+        # one bitmap per distinct value of each declared field; list values index every element
+        self.doc_ids = Bitmap.from_values(self.docmap)
+        values_by_field: dict[str, dict[str, list[int]]] = {}
+        for field in filter_fields:
+            if field == DOC_ID_FIELD:
+                continue
+            values = values_by_field.setdefault(field, {})
+            for doc_id, movie in self.docmap.items():
+                value = movie.get(field)
+                for item in value if isinstance(value, list | tuple | set) else [value]:
+                    if item is None or isinstance(item, dict):
+                        continue
+                    values.setdefault(str(item), []).append(doc_id)
+        self.filters = {
+            field: {value: Bitmap.from_values(doc_ids) for value, doc_ids in values.items()}
+            for field, values in values_by_field.items()
+        }
+
+    def filter_docs(self, filters: Iterable[str] | None) -> Bitmap | None:
+        # resolve `field=value` / `field=lo..hi` expressions (ANDed together) into allowed doc ids
+        # returns None when there is nothing to filter on
+        allowed: Bitmap | None = None
+        for expr in filters or ():
+            field, sep, value = expr.partition("=")
+            if not sep or not field or not value:
+                raise InvalidFilter(f"Expected field=value, got '{expr}'")
+            bounds = _parse_range(value)
+            is_range = bounds is not None
+            if is_range:
+                lo, hi = bounds
+            if field == DOC_ID_FIELD:
+                if is_range:
+                    matched = self.doc_ids.select_range(
+                        None if lo is None else math.ceil(lo), None if hi is None else math.floor(hi)
+                    )
+                else:
+                    try:
+                        doc_id = int(value)
+                    except ValueError as e:
+                        raise InvalidFilter(f"Doc id filter must be an integer, got '{value}'") from e
+                    matched = Bitmap.from_values([doc_id] if doc_id in self.doc_ids else [])
+            elif field in self.filters:
+                if is_range:
+                    matched = Bitmap()
+                    for key, doc_ids in self.filters[field].items():
+                        try:
+                            number = float(key)
+                        except ValueError:
+                            continue
+                        if (lo is None or number >= lo) and (hi is None or number <= hi):
+                            matched = matched | doc_ids
+                else:
+                    matched = self.filters[field].get(value, Bitmap())
+            else:
+                available = sorted({DOC_ID_FIELD, *self.filters})
+                raise InvalidFilter(f"Field '{field}' is not filterable; available: {available}")
+            allowed = matched if allowed is None else allowed & matched
+        return allowed
+
     def __get_avg_doc_length(self) -> float:
         # calculate and return average document length across all documents
         lengths = self.doc_lengths.values()
@@ -193,53 +383,202 @@ class InvertedIndex:
 
     def get_bm25_idf(self, term: str) -> float:
         # calculate the bm25 of a normalized string and return value
-        # log((N - df + 0.5) / (df + 0.5) + 1)
         token = normalize(term)
         if len(token) > 1:
             raise InvalidTerm("Expected sinle word term, not multiple tokens")
-        num_docs = len(self.docmap)
         occurance = self.index.get(token[0], set())
-        bm25_idf = math.log((int(num_docs) - len(occurance) + 0.5) / (len(occurance) + 0.5) + 1)
-        return bm25_idf
+        return self._bm25_idf(len(occurance))
+
+    def _bm25_idf(self, df: int) -> float:
+        # log((N - df + 0.5) / (df + 0.5) + 1)
+        num_docs = len(self.docmap)
+        return math.log((int(num_docs) - df + 0.5) / (df + 0.5) + 1)
 
     def get_bm25_tf(self, doc_id, term, k1=BM25_K1, b=BM25_B):
-        # length normalization factor
-        # length_norm = 1 - b + b * (doc_length / avg_doc_length)
-        doc_length = self.doc_lengths[doc_id]
         avg_doc_length = self.__get_avg_doc_length()
         if avg_doc_length == 0:
             return 0.0
-        length_norm = 1 - b + b * (doc_length / avg_doc_length)
         num = self.get_tf(doc_id, term)
-        bm25_tf = (num * (k1 + 1)) / (num + k1 * length_norm)
-        return bm25_tf
+        return self._bm25_tf(num, self.doc_lengths[doc_id], avg_doc_length, k1, b)
+
+    @staticmethod
+    def _bm25_tf(num: int, doc_length: int, avg_doc_length: float, k1=BM25_K1, b=BM25_B) -> float:
+        # length normalization factor
+        # length_norm = 1 - b + b * (doc_length / avg_doc_length)
+        length_norm = 1 - b + b * (doc_length / avg_doc_length)
+        return (num * (k1 + 1)) / (num + k1 * length_norm)
 
     def bm25(self, doc_id, term) -> float:
         # return true bm25 calculation with bm25_idf and bm25_tf
         return self.get_bm25_tf(doc_id, term) * self.get_bm25_idf(term)
 
-    def bm25_search(self, query, limit=DEFAULT_MAX_TITLES):
-        result = []
+    def bm25_search(self, query, limit=DEFAULT_MAX_TITLES, explain: dict[str, Any] | None = None):
+        # top `limit` (doc_id, title, score) results
+        return self.bm25_search_page(query, limit=limit, explain=explain)["results"]
+
+    def bm25_search_page(
+        self,
+        query: str,
+        offset: int = 0,
+        limit: int = DEFAULT_MAX_TITLES,
+        cursor: str | None = None,
+        explain: dict[str, Any] | None = None,
+        allowed: Bitmap | None = None,
+    ) -> dict[str, Any]:
+        # one page of results ranked by score desc, then doc id asc, plus a cursor for the next page
+        # score only documents found in the postings of the query terms (and in `allowed`, if given)
+        # pass an `explain` dict to have it filled with per-term and per-stage cost details
+        stage_start = time.perf_counter()
         tokens = normalize(query)
+        normalize_seconds = time.perf_counter() - stage_start
+
+        stage_start = time.perf_counter()
         scores = {}  # doc_ids : total bm25 score
-        for doc_id in self.docmap.keys():
-            scores[doc_id] = 0
-            for token in tokens:
-                scores[doc_id] += self.bm25(doc_id, token)
-        # known algorithm for sortin dict by values
-        sorted_dict = {k: v for k, v in sorted(scores.items(), key=lambda item: item[1], reverse=True)}
-        # limit to just 5 items from the dictionary
-        for idx, k in enumerate(sorted_dict):
-            if idx == limit:
-                break
-            result.append((k, self.docmap[k]["title"], sorted_dict[k]))
-        return result
+        terms = []
+        avg_doc_length = self.__get_avg_doc_length()
+        postings_scanned = 0
+        for token in tokens:
+            postings = self.index.get(token, set())
+            # idf stays corpus-wide so filtered and unfiltered scores are comparable
+            idf = self._bm25_idf(len(postings))
+            terms.append({"term": token, "df": len(postings), "idf": idf})
+            if avg_doc_length == 0:
+                continue
+            postings_scanned += min(len(postings), len(allowed)) if allowed is not None else len(postings)
+            for doc_id in _filtered_postings(postings, allowed):
+                num = self.term_frequencies[doc_id][token]
+                tf = self._bm25_tf(num, self.doc_lengths[doc_id], avg_doc_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + tf * idf
+        score_seconds = time.perf_counter() - stage_start
+
+        stage_start = time.perf_counter()
+        # heap top-k over (-score, doc_id) keys; no full sort of the scored documents
+        page, next_cursor = _select_page(
+            ((-score, doc_id) for doc_id, score in scores.items()), BM25_CURSOR, offset, limit, cursor
+        )
+        result = [(doc_id, self.docmap[doc_id]["title"], -neg_score) for neg_score, doc_id in page]
+        rank_seconds = time.perf_counter() - stage_start
+
+        if explain is not None:
+            explain.update(
+                {
+                    "query": query,
+                    "tokens": tokens,
+                    "terms": terms,
+                    "postings_scanned": postings_scanned,
+                    "docs_scored": len(scores),
+                    "filter_docs": len(allowed) if allowed is not None else None,
+                    "num_docs": len(self.docmap),
+                    "timings": {
+                        "normalize": normalize_seconds,
+                        "score": score_seconds,
+                        "rank": rank_seconds,
+                    },
+                }
+            )
+        return {"results": result, "next_cursor": next_cursor}
+
+    def stats(self, top_n: int = DEFAULT_STATS_TOP_N) -> dict[str, Any]:
+        # size and shape of the loaded index, for capacity planning
+        postings_lengths = sorted(len(doc_ids) for doc_ids in self.index.values())
+        num_docs = len(self.docmap)
+        longest = heapq.nsmallest(top_n, self.index.items(), key=lambda item: (-len(item[1]), item[0]))
+        return {
+            "version": self.version,
+            "num_docs": num_docs,
+            "vocabulary_size": len(self.index),
+            "total_postings": sum(postings_lengths),
+            "avg_doc_length": self.__get_avg_doc_length(),
+            "postings_length": {
+                "min": postings_lengths[0] if postings_lengths else 0,
+                "mean": (sum(postings_lengths) / len(postings_lengths)) if postings_lengths else 0.0,
+                "p50": _percentile(postings_lengths, 50),
+                "p90": _percentile(postings_lengths, 90),
+                "p99": _percentile(postings_lengths, 99),
+                "max": postings_lengths[-1] if postings_lengths else 0,
+            },
+            # terms in most documents; a high doc fraction usually means a missing stopword
+            "longest_postings": [
+                {"term": term, "df": len(doc_ids), "doc_fraction": (len(doc_ids) / num_docs) if num_docs else 0.0}
+                for term, doc_ids in longest
+            ],
+            "memory_bytes": {
+                "index": _deep_sizeof(self.index),
+                "docmap": _deep_sizeof(self.docmap),
+                "term_frequencies": _deep_sizeof(self.term_frequencies),
+                "doc_lengths": _deep_sizeof(self.doc_lengths),
+                "filters": _deep_sizeof(self.doc_ids) + _deep_sizeof(self.filters),
+            },
+            "filter_fields": {field: len(values) for field, values in self.filters.items()},
+            "artifact_bytes": dict(self.artifact_bytes),
+            "load_seconds": self.load_seconds,
+        }
 
     def _debug_cache(self) -> None:
         # For Dev: debug cache contents and structure
         # JSON cannot encode sets directly, so serialize posting lists as sorted arrays.
         index_for_json = {token: sorted(doc_ids) for token, doc_ids in self.index.items()}
-        with open("./cache/index.json", "w") as ifp:
+        with open(f"{CACHE_DIR}/index.json", "w") as ifp:
             json.dump(index_for_json, ifp, ensure_ascii=False, indent=2)
-        with open("./cache/docmap.json", "w") as dfp:
+        with open(f"{CACHE_DIR}/docmap.json", "w") as dfp:
             json.dump(self.docmap, dfp, ensure_ascii=False, indent=2)
+
+
+class LiveIndex:
+    """
+    Long-running holder for an InvertedIndex that hot-swaps to newly published snapshots.
+
+    Queries grab `live.index` once and use that reference for the whole request, which pins them to
+    one snapshot. A background thread watches CURRENT, loads a new snapshot fully off to the side and
+    then swaps the reference in a single assignment, so in-flight queries are never paused.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, poll_interval: float = SNAPSHOT_POLL_SECONDS):
+        self._cache_dir = cache_dir
+        self._poll_interval = poll_interval
+        self._index = InvertedIndex.from_cache(cache_dir)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        # last error seen while reloading; the previous snapshot keeps serving meanwhile
+        self.last_error: SearchEngineError | OSError | None = None
+
+    @property
+    def index(self) -> InvertedIndex:
+        return self._index
+
+    @property
+    def version(self) -> str | None:
+        return self._index.version
+
+    def refresh(self) -> bool:
+        # load the published snapshot if it changed; return True when a swap happened
+        version = current_version(self._cache_dir)
+        if version == self._index.version:
+            return False
+        self._index = InvertedIndex.from_cache(self._cache_dir, version)
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="index-snapshot-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self._poll_interval):
+            try:
+                self.refresh()
+                self.last_error = None
+            except (SearchEngineError, OSError) as e:
+                # e.g. a PermissionError/EIO on CURRENT or a corrupt snapshot: keep polling, keep serving
+                # report each distinct failure once rather than on every poll
+                if repr(e) != repr(self.last_error):
+                    print(f"Snapshot reload failed, still serving {self.version}: {e}", file=sys.stderr)
+                self.last_error = e
@@ -0,0 +1,246 @@
+# Versioned, crash-safe storage for index artifacts
+"""
+Layout under the cache directory:
+
+    cache/
+      CURRENT                  -> name of the published snapshot
+      snapshots/
+        <version>/
+          manifest.json        -> version, created_at, per-artifact sha256 + size
+          index.pkl
+          docmap.pkl
+          term_frequencies.pkl
+          doc_lengths.pkl
+          filters.pkl
+
+* A snapshot is written into a hidden temp directory, fsynced, then renamed into place
+* Publishing swaps CURRENT with os.replace, so readers see either the old or the new version
+* Readers resolve CURRENT once and read every artifact from that one pinned directory
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from typing import Any
+
+from errors.exception_handling import CacheIOError, DataLoadError, SnapshotIntegrityError
+from helpers import (
+    CACHE_DIR,
+    CURRENT_FILENAME,
+    DOC_LENGTHS_FILENAME,
+    DOCMAP_FILENAME,
+    FILTERS_FILENAME,
+    INDEX_FILENAME,
+    MANIFEST_FILENAME,
+    SNAPSHOT_RETENTION,
+    SNAPSHOT_TEMP_MAX_AGE_SECONDS,
+    SNAPSHOTS_DIRNAME,
+    TF_FILENAME,
+)
+
+ARTIFACT_FILES: dict[str, str] = {
+    "index": INDEX_FILENAME,
+    "docmap": DOCMAP_FILENAME,
+    "term_frequencies": TF_FILENAME,
+    "doc_lengths": DOC_LENGTHS_FILENAME,
+    "filters": FILTERS_FILENAME,
+}
+
+
+def snapshots_dir(cache_dir: str = CACHE_DIR) -> str:
+    return os.path.join(cache_dir, SNAPSHOTS_DIRNAME)
+
+
+def _fsync_dir(path: str) -> None:
+    # make a rename/create inside `path` durable
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_file(path: str, payload: bytes) -> None:
+    with open(path, "wb") as fp:
+        fp.write(payload)
+        fp.flush()
+        os.fsync(fp.fileno())
+
+
+def write_snapshot(artifacts: dict[str, Any], cache_dir: str = CACHE_DIR) -> str:
+    # write every artifact plus a manifest into a new snapshot directory and return its version
+    # the snapshot is complete on disk before this returns, but it is not published yet
+    root = snapshots_dir(cache_dir)
+    os.makedirs(root, exist_ok=True)
+    version = str(time.time_ns())
+    tmp_dir = os.path.join(root, f".tmp-{version}-{os.getpid()}")
+    os.mkdir(tmp_dir)
+    try:
+        manifest: dict[str, Any] = {"version": version, "created_at": time.time(), "artifacts": {}}
+        for name, file_name in ARTIFACT_FILES.items():
+            payload = pickle.dumps(artifacts[name], protocol=pickle.HIGHEST_PROTOCOL)
+            _write_file(os.path.join(tmp_dir, file_name), payload)
+            manifest["artifacts"][name] = {
+                "file": file_name,
+                "sha256": hashlib.sha256(payload).hexdigest(),
+                "bytes": len(payload),
+            }
+        _write_file(os.path.join(tmp_dir, MANIFEST_FILENAME), json.dumps(manifest, indent=2).encode())
+        _fsync_dir(tmp_dir)
+        os.rename(tmp_dir, os.path.join(root, version))
+        _fsync_dir(root)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return version
+
+
+def publish(version: str, cache_dir: str = CACHE_DIR) -> None:
+    # atomically point CURRENT at an already written snapshot
+    if not os.path.isfile(os.path.join(snapshots_dir(cache_dir), version, MANIFEST_FILENAME)):
+        raise CacheIOError(f"Cannot publish missing snapshot: {version}")
+    current_path = os.path.join(cache_dir, CURRENT_FILENAME)
+    tmp_path = f"{current_path}.tmp-{os.getpid()}"
+    _write_file(tmp_path, version.encode())
+    os.replace(tmp_path, current_path)
+    _fsync_dir(cache_dir)
+
+
+def current_version(cache_dir: str = CACHE_DIR) -> str:
+    # return the published snapshot version
+    try:
+        with open(os.path.join(cache_dir, CURRENT_FILENAME)) as fp:
+            version = fp.read().strip()
+    except FileNotFoundError as e:
+        raise DataLoadError(f"No published index snapshot in {cache_dir}: {e}") from e
+    if not version:
+        raise DataLoadError(f"Empty {CURRENT_FILENAME} pointer in {cache_dir}")
+    return version
+
+
+def read_manifest(version: str, cache_dir: str = CACHE_DIR) -> dict[str, Any]:
+    path = os.path.join(snapshots_dir(cache_dir), version, MANIFEST_FILENAME)
+    try:
+        with open(path) as fp:
+            return json.load(fp)
+    except FileNotFoundError as e:
+        raise DataLoadError(f"Missing manifest for snapshot {version}: {e}") from e
+    except json.JSONDecodeError as e:
+        raise SnapshotIntegrityError(f"Corrupt manifest for snapshot {version}") from e
+
+
+def _manifest_entries(manifest: Any, version: str) -> list[tuple[str, str, str]]:
+    # (name, file, sha256) per artifact; a manifest of the wrong shape is an integrity error
+    try:
+        if manifest["version"] != version:
+            raise SnapshotIntegrityError(f"Manifest of snapshot {version} claims version {manifest['version']}")
+        entries = []
+        for name, entry in manifest["artifacts"].items():
+            file_name, sha256, _size = entry["file"], entry["sha256"], entry["bytes"]
+            if not isinstance(file_name, str) or not isinstance(sha256, str):
+                raise TypeError(f"bad file/sha256 for artifact {name}")
+            entries.append((name, file_name, sha256))
+    except (KeyError, TypeError, AttributeError) as e:
+        raise SnapshotIntegrityError(f"Malformed manifest for snapshot {version}: {e!r}") from e
+    return entries
+
+
+def read_snapshot(cache_dir: str = CACHE_DIR, version: str | None = None) -> tuple[str, dict[str, Any], dict[str, Any]]:
+    # load every artifact of one snapshot, verifying checksums against the manifest
+    # version=None pins whatever CURRENT points at when the read starts
+    # returns (version, artifacts, manifest) so callers never need to re-read the manifest
+    if version is None:
+        version = current_version(cache_dir)
+    manifest = read_manifest(version, cache_dir)
+    snapshot_path = os.path.join(snapshots_dir(cache_dir), version)
+    artifacts: dict[str, Any] = {}
+    for name, file_name, sha256 in _manifest_entries(manifest, version):
+        try:
+            with open(os.path.join(snapshot_path, file_name), "rb") as fp:
+                payload = fp.read()
+        except FileNotFoundError as e:
+            raise DataLoadError(f"Snapshot {version} is missing artifact {name}: {e}") from e
+        if hashlib.sha256(payload).hexdigest() != sha256:
+            raise SnapshotIntegrityError(f"Checksum mismatch for {name} in snapshot {version}")
+        try:
+            artifacts[name] = pickle.loads(payload)
+        except Exception as e:
+            # e.g. a snapshot written by code whose classes were since renamed or moved
+            raise SnapshotIntegrityError(f"Cannot unpickle {name} in snapshot {version}: {e!r}") from e
+    missing = set(ARTIFACT_FILES) - set(artifacts)
+    if missing:
+        raise SnapshotIntegrityError(f"Snapshot {version} manifest lacks artifacts: {sorted(missing)}")
+    return version, artifacts, manifest
+
+
+def list_snapshots(cache_dir: str = CACHE_DIR) -> list[str]:
+    # completed snapshot versions, oldest first (temp dirs are skipped)
+    root = snapshots_dir(cache_dir)
+    if not os.path.isdir(root):
+        return []
+    versions = [name for name in os.listdir(root) if not name.startswith(".")]
+    return sorted(versions, key=lambda v: (len(v), v))
+
+
+def _pid_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # exists, but owned by someone else
+        return True
+    return True
+
+
+def _is_stale_temp(path: str, pid_text: str, max_age: float) -> bool:
+    # a temp entry is abandoned once its writer is gone, or (pids get reused) once it is too old
+    try:
+        age = time.time() - os.path.getmtime(path)
+    except FileNotFoundError:
+        return False
+    if age > max_age:
+        return True
+    return pid_text.isdigit() and not _pid_running(int(pid_text))
+
+
+def remove_stale_temps(cache_dir: str = CACHE_DIR, max_age: float = SNAPSHOT_TEMP_MAX_AGE_SECONDS) -> list[str]:
+    # clean up snapshots/.tmp-<version>-<pid> dirs and CURRENT.tmp-<pid> files left by killed builds
+    removed = []
+    root = snapshots_dir(cache_dir)
+    if os.path.isdir(root):
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if name.startswith(".tmp-") and _is_stale_temp(path, name.rsplit("-", 1)[-1], max_age):
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(path)
+    current_prefix = f"{CURRENT_FILENAME}.tmp-"
+    if os.path.isdir(cache_dir):
+        for name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, name)
+            if name.startswith(current_prefix) and _is_stale_temp(path, name[len(current_prefix) :], max_age):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                removed.append(path)
+    return removed
+
+
+def prune_snapshots(cache_dir: str = CACHE_DIR, keep: int = SNAPSHOT_RETENTION) -> list[str]:
+    # delete all but the newest `keep` snapshots, never the published one
+    # older snapshots stay around for a while so readers pinned to them can finish loading
+    # abandoned temp dirs/files from crashed builds are removed as well
+    remove_stale_temps(cache_dir)
+    try:
+        current = current_version(cache_dir)
+    except DataLoadError:
+        current = None
+    versions = list_snapshots(cache_dir)
+    stale = [v for v in versions[: max(len(versions) - keep, 0)] if v != current]
+    for version in stale:
+        shutil.rmtree(os.path.join(snapshots_dir(cache_dir), version), ignore_errors=True)
+    return stale
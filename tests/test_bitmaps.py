@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from cli.bitmaps import ARRAY_CONTAINER_MAX, Bitmap
+
+
+def test_from_values_supports_membership_and_sorted_iteration():
+    bm = Bitmap.from_values([70000, 3, 1, 3, 65536])
+
+    assert len(bm) == 4
+    assert list(bm) == [1, 3, 65536, 70000]
+    assert 65536 in bm
+    assert 2 not in bm
+    assert -1 not in bm
+
+
+def test_dense_chunks_use_bitset_and_still_intersect_with_sparse():
+    dense = Bitmap.from_values(range(ARRAY_CONTAINER_MAX * 2))
+    sparse = Bitmap.from_values([5, 10, ARRAY_CONTAINER_MAX * 3])
+
+    assert isinstance(dense._containers[0], bytearray)
+    assert list(dense & sparse) == [5, 10]
+    assert len(dense | sparse) == ARRAY_CONTAINER_MAX * 2 + 1
+
+
+def test_select_range_is_inclusive_and_open_ended():
+    bm = Bitmap.from_values([1, 5, 10, 70000])
+
+    assert list(bm.select_range(5, 10)) == [5, 10]
+    assert list(bm.select_range(6, None)) == [10, 70000]
+    assert list(bm.select_range(None, 4)) == [1]
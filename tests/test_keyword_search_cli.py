@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from argparse import Namespace
 
+import pytest
 from errors.exception_handling import SearchEngineError
 
 import cli.keyword_search_cli as cli_mod
@@ -12,14 +13,17 @@ class _FakeMovieSearch:
         self._movies = [{"id": 1, "title": "Any", "description": "Any"}]
         self.printed = None
 
-    def find_titles(self, query, idx_cache, docmap_cache):
+    def find_page(self, query, idx_cache, docmap_cache, offset, limit, cursor, allowed):
         self.last_query = query
         self.last_idx = idx_cache
         self.last_docmap = docmap_cache
-        return ["Brave"]
+        self.last_page = (offset, limit, cursor)
+        self.last_allowed = allowed
+        return {"results": [(1, "Brave")], "next_cursor": "abc"}
 
-    def print_results(self, titles):
+    def print_results(self, titles, n, start):
         self.printed = titles
+        self.printed_start = start
 
 
 def test_main_search_path_runs_query(monkeypatch, capsys):
@@ -28,7 +32,7 @@ def test_main_search_path_runs_query(monkeypatch, capsys):
     monkeypatch.setattr(
         cli_mod.argparse.ArgumentParser,
         "parse_args",
-        lambda _self: Namespace(command="search", query="brave"),
+        lambda _self: Namespace(command="search", query="brave", page=2, page_size=5, cursor=None, filter=["id=1"]),
     )
     monkeypatch.setattr(cli_mod.MovieSearch, "from_file", classmethod(lambda _cls: fake_ms))
     monkeypatch.setattr(
@@ -38,7 +42,11 @@ def test_main_search_path_runs_query(monkeypatch, capsys):
             lambda _cls: type(
                 "LoadedInv",
                 (),
-                {"index": {"brave": [1]}, "docmap": {1: {"title": "Brave"}}},
+                {
+                    "index": {"brave": [1]},
+                    "docmap": {1: {"title": "Brave"}},
+                    "filter_docs": lambda _self, filters: {"resolved": filters},
+                },
             )()
         ),
     )
@@ -50,6 +58,10 @@ def test_main_search_path_runs_query(monkeypatch, capsys):
     assert "Loading cache files..." in out
     assert "Searching for: brave" in out
     assert fake_ms.printed == ["Brave"]
+    assert fake_ms.last_page == (5, 5, None)
+    assert fake_ms.printed_start == 5
+    assert fake_ms.last_allowed == {"resolved": ["id=1"]}
+    assert "Next cursor: abc" in out
 
 
 def test_main_build_path_calls_build(monkeypatch):
@@ -59,14 +71,15 @@ def test_main_build_path_calls_build(monkeypatch):
     monkeypatch.setattr(
         cli_mod.argparse.ArgumentParser,
         "parse_args",
-        lambda _self: Namespace(command="build", query=None),
+        lambda _self: Namespace(command="build", query=None, filter_field=["genre"]),
     )
     monkeypatch.setattr(cli_mod.MovieSearch, "from_file", classmethod(lambda _cls: fake_ms))
 
     class _FakeInv:
-        def build(self, movies):
+        def build(self, movies, filter_fields):
             build_calls["count"] += 1
             build_calls["movies"] = movies
+            build_calls["filter_fields"] = filter_fields
 
     monkeypatch.setattr(cli_mod, "InvertedIndex", _FakeInv)
 
@@ -75,6 +88,7 @@ def test_main_build_path_calls_build(monkeypatch):
     assert rc is None
     assert build_calls["count"] == 1
     assert build_calls["movies"] == fake_ms._movies
+    assert build_calls["filter_fields"] == ["genre"]
 
 
 def test_main_returns_2_when_loading_movies_fails(monkeypatch, capsys):
@@ -140,3 +154,82 @@ def test_main_tf_path_prints_frequency(monkeypatch, capsys):
     assert rc is None
     assert "Fetching term frequency with params 424 -- trapper" in out
     assert "Term frequency for trapper --> 4" in out
+
+
+def test_main_stats_path_prints_report(monkeypatch, capsys):
+    fake_ms = _FakeMovieSearch()
+
+    monkeypatch.setattr(
+        cli_mod.argparse.ArgumentParser,
+        "parse_args",
+        lambda _self: Namespace(command="stats", top=1),
+    )
+    monkeypatch.setattr(cli_mod.MovieSearch, "from_file", classmethod(lambda _cls: fake_ms))
+
+    class _FakeInv:
+        def stats(self, top_n):
+            return {
+                "version": "1",
+                "num_docs": 2,
+                "vocabulary_size": 3,
+                "total_postings": 4,
+                "avg_doc_length": 2.0,
+                "postings_length": {"min": 1, "mean": 1.33, "p50": 1, "p90": 2, "p99": 2, "max": 2},
+                "longest_postings": [{"term": "film", "df": 2, "doc_fraction": 1.0}][:top_n],
+                "filter_fields": {},
+                "memory_bytes": {"index": 100},
+                "artifact_bytes": {"index": 50},
+                "load_seconds": 0.01,
+            }
+
+    monkeypatch.setattr(cli_mod.InvertedIndex, "from_cache", classmethod(lambda _cls: _FakeInv()))
+
+    rc = cli_mod.main()
+
+    out = capsys.readouterr().out
+    assert rc is None
+    assert "Vocabulary size: 3" in out
+    assert "film\t2\t(100.0% of docs)" in out
+
+
+def test_stats_rejects_non_positive_top(monkeypatch, capsys):
+    monkeypatch.setattr("sys.argv", ["keyword_search_cli.py", "stats", "--top", "-1"])
+
+    with pytest.raises(SystemExit):
+        cli_mod.main()
+
+    assert "expected a positive integer" in capsys.readouterr().err
+
+
+def test_search_rejects_page_together_with_cursor(monkeypatch, capsys):
+    monkeypatch.setattr("sys.argv", ["keyword_search_cli.py", "search", "bear", "--page", "2", "--cursor", "abc"])
+
+    with pytest.raises(SystemExit):
+        cli_mod.main()
+
+    assert "not allowed with argument" in capsys.readouterr().err
+
+
+def test_main_search_with_cursor_prints_unnumbered_results(monkeypatch):
+    fake_ms = _FakeMovieSearch()
+
+    monkeypatch.setattr(
+        cli_mod.argparse.ArgumentParser,
+        "parse_args",
+        lambda _self: Namespace(command="search", query="brave", page=1, page_size=5, cursor="abc", filter=None),
+    )
+    monkeypatch.setattr(cli_mod.MovieSearch, "from_file", classmethod(lambda _cls: fake_ms))
+
+    class _FakeInv:
+        index = {"brave": [1]}
+        docmap = {1: {"title": "Brave"}}
+
+        def filter_docs(self, filters):
+            return None
+
+    monkeypatch.setattr(cli_mod.InvertedIndex, "from_cache", classmethod(lambda _cls: _FakeInv()))
+
+    cli_mod.main()
+
+    assert fake_ms.last_page == (0, 5, "abc")
+    assert fake_ms.printed_start is None
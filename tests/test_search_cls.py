@@ -1,9 +1,21 @@
 from __future__ import annotations
 
+import time
+from collections import Counter
+
 import pytest
-from errors.exception_handling import DataLoadError, IndexBuildError, InvalidTerm
+from errors.exception_handling import (
+    DataLoadError,
+    IndexBuildError,
+    InvalidCursor,
+    InvalidFilter,
+    InvalidPage,
+    InvalidTerm,
+    SnapshotIntegrityError,
+)
+from helpers import encode_cursor
 
-from cli.search_cls import InvertedIndex, MovieSearch
+from cli.search_cls import InvertedIndex, LiveIndex, MovieSearch
 
 
 def make_movies():
@@ -115,3 +127,245 @@ def test_get_bm25_tf_uses_doc_lengths_for_length_normalization(monkeypatch):
     score = inv.get_bm25_tf(1, "star")
 
     assert score > 0
+
+
+def test_save_publishes_snapshot_readable_by_from_cache(tmp_path):
+    inv = InvertedIndex()
+    inv.index = {"bear": {424}}
+    inv.docmap = {424: {"id": 424, "title": "The Revenant"}}
+    inv.term_frequencies = {424: {"bear": 2}}
+    inv.doc_lengths = {424: 2}
+
+    version = inv.save(str(tmp_path))
+    loaded = InvertedIndex.from_cache(str(tmp_path))
+
+    assert loaded.version == version
+    assert loaded.index == inv.index
+    assert loaded.docmap == inv.docmap
+    assert set(loaded.artifact_bytes) == {"index", "docmap", "term_frequencies", "doc_lengths", "filters"}
+
+
+def test_live_index_refresh_swaps_to_new_snapshot(tmp_path):
+    first = InvertedIndex()
+    first.docmap = {1: {"id": 1, "title": "Old"}}
+    first.save(str(tmp_path))
+    live = LiveIndex(str(tmp_path))
+    pinned = live.index
+
+    second = InvertedIndex()
+    second.docmap = {1: {"id": 1, "title": "New"}}
+    second.save(str(tmp_path))
+
+    assert live.refresh() is True
+    assert live.index.docmap[1]["title"] == "New"
+    assert pinned.docmap[1]["title"] == "Old"
+    assert live.refresh() is False
+
+
+def make_scored_index():
+    inv = InvertedIndex()
+    inv.index = {"bear": {1, 2}, "trapper": {1}, "film": {1, 2, 3}}
+    inv.docmap = {1: {"title": "The Revenant"}, 2: {"title": "Brave"}, 3: {"title": "Heat"}}
+    inv.term_frequencies = {
+        1: Counter({"bear": 2, "trapper": 1, "film": 1}),
+        2: Counter({"bear": 1, "film": 1}),
+        3: Counter({"film": 1}),
+    }
+    inv.doc_lengths = {1: 4, 2: 2, 3: 1}
+    return inv
+
+
+def test_bm25_search_explain_reports_terms_and_postings(monkeypatch):
+    inv = make_scored_index()
+    monkeypatch.setattr("cli.search_cls.normalize", lambda q: ["bear", "trapper"])
+    explain = {}
+
+    results = inv.bm25_search("bear trapper", explain=explain)
+
+    assert [doc_id for doc_id, _title, _score in results] == [1, 2]
+    assert [term["df"] for term in explain["terms"]] == [2, 1]
+    assert explain["postings_scanned"] == 3
+    assert explain["docs_scored"] == 2
+    assert set(explain["timings"]) == {"normalize", "score", "rank"}
+
+
+def test_stats_reports_vocabulary_and_longest_postings():
+    inv = make_scored_index()
+
+    stats = inv.stats(top_n=1)
+
+    assert stats["vocabulary_size"] == 3
+    assert stats["total_postings"] == 6
+    assert stats["postings_length"]["max"] == 3
+    assert stats["longest_postings"] == [{"term": "film", "df": 3, "doc_fraction": 1.0}]
+    assert stats["memory_bytes"]["index"] > 0
+
+
+def test_bm25_search_page_cursor_walks_all_results_once(monkeypatch):
+    inv = make_scored_index()
+    monkeypatch.setattr("cli.search_cls.normalize", lambda q: ["film"])
+
+    first = inv.bm25_search_page("film", limit=2)
+    second = inv.bm25_search_page("film", limit=2, cursor=first["next_cursor"])
+    by_offset = inv.bm25_search_page("film", offset=2, limit=2)
+
+    seen = [doc_id for doc_id, _title, _score in first["results"] + second["results"]]
+    assert sorted(seen) == [1, 2, 3]
+    assert second["results"] == by_offset["results"]
+    assert second["next_cursor"] is None
+
+
+def test_bm25_search_page_rejects_malformed_cursor(monkeypatch):
+    inv = make_scored_index()
+    monkeypatch.setattr("cli.search_cls.normalize", lambda q: ["film"])
+
+    with pytest.raises(InvalidCursor):
+        inv.bm25_search_page("film", cursor="not-a-cursor")
+
+
+def test_find_page_returns_requested_slice_with_cursor(monkeypatch):
+    ms = MovieSearch(make_movies())
+    idx_cache = {"star": [3, 2, 1]}
+    docmap_cache = {1: {"title": "Star Trek"}, 2: {"title": "Star Wars"}, 3: {"title": "The Matrix"}}
+    monkeypatch.setattr("cli.search_cls.normalize", lambda q: ["star"])
+
+    first = ms.find_page("star", idx_cache, docmap_cache, limit=2)
+    second = ms.find_page("star", idx_cache, docmap_cache, limit=2, cursor=first["next_cursor"])
+
+    assert first["results"] == [(1, "Star Trek"), (2, "Star Wars")]
+    assert second == {"results": [(3, "The Matrix")], "next_cursor": None}
+
+
+def test_filter_docs_restricts_bm25_scoring_to_matching_docs(monkeypatch):
+    inv = make_scored_index()
+    inv.docmap[1]["genre"] = ["western", "drama"]
+    inv.docmap[2]["genre"] = "animation"
+    inv.docmap[3]["genre"] = "crime"
+    inv._build_filters(["genre"])
+    monkeypatch.setattr("cli.search_cls.normalize", lambda q: ["film"])
+    explain = {}
+
+    allowed = inv.filter_docs(["genre=animation"])
+    page = inv.bm25_search_page("film", allowed=allowed, explain=explain)
+
+    assert [doc_id for doc_id, _title, _score in page["results"]] == [2]
+    assert explain["docs_scored"] == 1
+    assert explain["postings_scanned"] == 1
+    assert list(inv.filter_docs(["genre=drama", "id=1..2"])) == [1]
+    assert list(inv.filter_docs(["id=2.."])) == [2, 3]
+
+
+def test_filter_docs_rejects_undeclared_field():
+    inv = make_scored_index()
+    inv._build_filters([])
+
+    with pytest.raises(InvalidFilter):
+        inv.filter_docs(["year=1999"])
+
+
+def test_live_index_watcher_survives_os_errors(tmp_path, monkeypatch):
+    inv = InvertedIndex()
+    inv.docmap = {1: {"id": 1, "title": "Old"}}
+    inv.save(str(tmp_path))
+    live = LiveIndex(str(tmp_path), poll_interval=0.01)
+    calls = {"count": 0}
+
+    def failing_refresh():
+        calls["count"] += 1
+        raise PermissionError("CURRENT not readable")
+
+    monkeypatch.setattr(live, "refresh", failing_refresh)
+    live.start()
+    try:
+        deadline = time.monotonic() + 2
+        while calls["count"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert live._thread.is_alive()
+    finally:
+        live.stop()
+
+    assert calls["count"] >= 2
+    assert isinstance(live.last_error, PermissionError)
+
+
+def test_bm25_search_skips_unmatched_docs_and_breaks_ties_by_doc_id(monkeypatch):
+    inv = InvertedIndex()
+    # docmap insertion order deliberately differs from doc id order
+    inv.docmap = {3: {"title": "C"}, 2: {"title": "B"}, 1: {"title": "A"}}
+    inv.index = {"bear": {3, 1}, "space": {2}}
+    inv.term_frequencies = {3: Counter({"bear": 1}), 2: Counter({"space": 1}), 1: Counter({"bear": 1})}
+    inv.doc_lengths = {3: 1, 2: 1, 1: 1}
+    monkeypatch.setattr("cli.search_cls.normalize", lambda q: ["bear"])
+
+    results = inv.bm25_search("bear", limit=5)
+
+    assert [doc_id for doc_id, _title, _score in results] == [1, 3]
+    assert results[0][2] == results[1][2] > 0
+
+
+def test_bm25_search_page_rejects_cursor_with_wrong_kind_or_types(monkeypatch):
+    inv = make_scored_index()
+    ms = MovieSearch(make_movies())
+    monkeypatch.setattr("cli.search_cls.normalize", lambda q: ["film"])
+    keyword_cursor = ms.find_page("film", inv.index, inv.docmap, limit=1)["next_cursor"]
+
+    with pytest.raises(InvalidCursor):
+        inv.bm25_search_page("film", cursor=keyword_cursor)
+    with pytest.raises(InvalidCursor):
+        inv.bm25_search_page("film", cursor=encode_cursor("bm25", ("a", 1)))
+    with pytest.raises(InvalidCursor):
+        inv.bm25_search_page("film", cursor=encode_cursor("bm25", (10**400, 1)))
+    with pytest.raises(InvalidCursor):
+        inv.bm25_search_page("film", cursor=encode_cursor("bm25", (float("nan"), 1)))
+    with pytest.raises(InvalidCursor):
+        ms.find_page("film", inv.index, inv.docmap, cursor=encode_cursor("keyword", (True,)))
+
+
+def test_print_results_without_start_is_unnumbered(capsys):
+    ms = MovieSearch(make_movies())
+    ms.print_results(["A", "B"], n=2, start=None)
+    assert capsys.readouterr().out.splitlines() == ["- A", "- B"]
+
+
+def test_filter_docs_treats_non_numeric_dotted_value_as_exact_match():
+    inv = make_scored_index()
+    inv.docmap[1]["title"] = "Kaakha..Kaakha: The Police"
+    inv._build_filters(["title"])
+
+    assert list(inv.filter_docs(["title=Kaakha..Kaakha: The Police"])) == [1]
+    assert list(inv.filter_docs(["title=A..B"])) == []
+
+
+def test_filter_docs_rejects_non_finite_range_bounds():
+    inv = make_scored_index()
+    inv._build_filters([])
+
+    for expr in ["id=inf..", "id=..-inf", "id=nan..3"]:
+        with pytest.raises(InvalidFilter):
+            inv.filter_docs([expr])
+
+
+def test_live_index_keeps_serving_when_new_snapshot_is_corrupt(tmp_path):
+    first = InvertedIndex()
+    first.docmap = {1: {"id": 1, "title": "Old"}}
+    first.save(str(tmp_path))
+    live = LiveIndex(str(tmp_path))
+    second = InvertedIndex()
+    second.docmap = {1: {"id": 1, "title": "New"}}
+    version = second.save(str(tmp_path))
+    manifest_path = tmp_path / "snapshots" / version / "manifest.json"
+    manifest_path.write_text(manifest_path.read_text().replace('"artifacts"', '"renamed"'))
+
+    with pytest.raises(SnapshotIntegrityError):
+        live.refresh()
+
+    assert live.index.docmap[1]["title"] == "Old"
+
+
+def test_bm25_search_page_handles_zero_and_negative_limits(monkeypatch):
+    inv = make_scored_index()
+    monkeypatch.setattr("cli.search_cls.normalize", lambda q: ["film"])
+
+    assert inv.bm25_search("film", limit=0) == []
+    with pytest.raises(InvalidPage):
+        inv.bm25_search_page("film", limit=-1)
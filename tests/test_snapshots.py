@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+
+import pytest
+from errors.exception_handling import CacheIOError, DataLoadError, SnapshotIntegrityError
+
+from cli.snapshots import (
+    current_version,
+    list_snapshots,
+    prune_snapshots,
+    publish,
+    read_snapshot,
+    snapshots_dir,
+    write_snapshot,
+)
+
+
+def make_artifacts(tag: str = "a"):
+    return {
+        "index": {tag: {1}},
+        "docmap": {1: {"id": 1, "title": tag}},
+        "term_frequencies": {1: {tag: 1}},
+        "doc_lengths": {1: 1},
+        "filters": {"doc_ids": [1], "fields": {}},
+    }
+
+
+def test_write_snapshot_is_not_visible_until_published(tmp_path):
+    version = write_snapshot(make_artifacts(), str(tmp_path))
+
+    assert list_snapshots(str(tmp_path)) == [version]
+    with pytest.raises(DataLoadError):
+        current_version(str(tmp_path))
+
+    publish(version, str(tmp_path))
+
+    loaded_version, artifacts, manifest = read_snapshot(str(tmp_path))
+    assert loaded_version == version
+    assert manifest["version"] == version
+    assert set(manifest["artifacts"]) == set(artifacts)
+    assert artifacts["index"] == {"a": {1}}
+
+
+def test_read_snapshot_pins_requested_version(tmp_path):
+    old = write_snapshot(make_artifacts("old"), str(tmp_path))
+    publish(old, str(tmp_path))
+    new = write_snapshot(make_artifacts("new"), str(tmp_path))
+    publish(new, str(tmp_path))
+
+    assert read_snapshot(str(tmp_path))[1]["docmap"][1]["title"] == "new"
+    assert read_snapshot(str(tmp_path), old)[1]["docmap"][1]["title"] == "old"
+
+
+def test_read_snapshot_detects_corrupted_artifact(tmp_path):
+    version = write_snapshot(make_artifacts(), str(tmp_path))
+    publish(version, str(tmp_path))
+    with open(os.path.join(snapshots_dir(str(tmp_path)), version, "index.pkl"), "ab") as fp:
+        fp.write(b"garbage")
+
+    with pytest.raises(SnapshotIntegrityError):
+        read_snapshot(str(tmp_path))
+
+
+def test_publish_rejects_unknown_version(tmp_path):
+    with pytest.raises(CacheIOError):
+        publish("does-not-exist", str(tmp_path))
+
+
+def test_prune_snapshots_keeps_newest_and_current(tmp_path):
+    versions = [write_snapshot(make_artifacts(str(n)), str(tmp_path)) for n in range(4)]
+    publish(versions[0], str(tmp_path))
+
+    removed = prune_snapshots(str(tmp_path), keep=2)
+
+    assert removed == [versions[1]]
+    assert list_snapshots(str(tmp_path)) == [versions[0], versions[2], versions[3]]
+
+
+def test_prune_snapshots_removes_temps_left_by_crashed_builds(tmp_path):
+    version = write_snapshot(make_artifacts(), str(tmp_path))
+    publish(version, str(tmp_path))
+    dead = subprocess.Popen(["true"])
+    dead.wait()
+    root = snapshots_dir(str(tmp_path))
+    crashed_dir = os.path.join(root, f".tmp-1-{dead.pid}")
+    os.mkdir(crashed_dir)
+    old_pointer = os.path.join(str(tmp_path), f"CURRENT.tmp-{os.getpid()}")
+    with open(old_pointer, "w") as fp:
+        fp.write(version)
+    os.utime(old_pointer, (0, 0))
+    in_progress_dir = os.path.join(root, f".tmp-2-{os.getpid()}")
+    os.mkdir(in_progress_dir)
+
+    prune_snapshots(str(tmp_path))
+
+    assert not os.path.exists(crashed_dir)
+    assert not os.path.exists(old_pointer)
+    assert os.path.isdir(in_progress_dir)
+    assert list_snapshots(str(tmp_path)) == [version]
+
+
+def _rewrite_manifest(tmp_path, version, update):
+    path = os.path.join(snapshots_dir(str(tmp_path)), version, "manifest.json")
+    with open(path) as fp:
+        manifest = json.load(fp)
+    update(manifest)
+    with open(path, "w") as fp:
+        json.dump(manifest, fp)
+
+
+def test_read_snapshot_reports_malformed_manifest_as_integrity_error(tmp_path):
+    version = write_snapshot(make_artifacts(), str(tmp_path))
+    publish(version, str(tmp_path))
+    _rewrite_manifest(tmp_path, version, lambda manifest: manifest["artifacts"]["index"].pop("file"))
+
+    with pytest.raises(SnapshotIntegrityError):
+        read_snapshot(str(tmp_path))
+
+
+def test_read_snapshot_reports_unpicklable_artifact_as_integrity_error(tmp_path):
+    version = write_snapshot(make_artifacts(), str(tmp_path))
+    publish(version, str(tmp_path))
+    # protocol 0 GLOBAL for a class whose module no longer exists
+    payload = b"cno_such_module_anymore\nBitmap\n."
+    with open(os.path.join(snapshots_dir(str(tmp_path)), version, "filters.pkl"), "wb") as fp:
+        fp.write(payload)
+    _rewrite_manifest(
+        tmp_path,
+        version,
+        lambda manifest: manifest["artifacts"]["filters"].update(sha256=hashlib.sha256(payload).hexdigest()),
+    )
+
+    with pytest.raises(SnapshotIntegrityError):
+        read_snapshot(str(tmp_path))